@@ -18,7 +18,7 @@ Usage:
   python fix_pixel_art.py input.png --override 24 24 --preview 6
 """
 
-import argparse, math
+import argparse
 from PIL import Image
 import numpy as np
 
@@ -35,6 +35,30 @@ except Exception:
     DITHER_NONE = Image.Dither.NONE
     DITHER_FS = Image.Dither.FLOYDSTEINBERG
 
+# Optional numba acceleration (pure-NumPy fallbacks everywhere it is used)
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except Exception:
+    HAVE_NUMBA = False
+
+# Optional scipy acceleration, same deal
+try:
+    from scipy.spatial import cKDTree
+    HAVE_SCIPY = True
+except Exception:
+    HAVE_SCIPY = False
+
+# Optional littlecms sRGB -> Lab transform (Pillow builds without it exist)
+try:
+    from PIL import ImageCms
+    _CMS_RGB2LAB = ImageCms.buildTransform(ImageCms.createProfile("sRGB"),
+                                           ImageCms.createProfile("LAB"),
+                                           "RGB", "LAB")
+    HAVE_CMS = True
+except Exception:
+    HAVE_CMS = False
+
 
 # ----------------------------- Transparency handling -----------------------------
 
@@ -49,13 +73,10 @@ def flatten_transparency_threshold(img: Image.Image) -> Image.Image:
         rgba = img.convert("RGBA")
         arr = np.array(rgba, dtype=np.uint8)
         rgb, a = arr[..., :3], arr[..., 3]
-        # masks
-        m_trans = a <= 64
-        # set RGB to black where mostly transparent
-        if m_trans.any():
-            rgb[m_trans] = 0
-        # force alpha to 255 everywhere (then we'll drop it)
-        # (no need to write back to arr beyond this)
+        # Branchless: multiply RGB by the 0/1 keep-mask in one uint8 pass
+        # (zeros out mostly-transparent pixels, keeps the rest).
+        rgb *= (a >= 128).astype(np.uint8)[..., None]
+        # alpha is dropped below, no need to force it to 255
         return Image.fromarray(rgb, mode="RGB")
     else:
         return img.convert("RGB")
@@ -67,18 +88,24 @@ def _srgb_to_linear(c):
     a = 0.055
     return np.where(c <= 0.04045, c/12.92, ((c + a)/(1 + a))**2.4)
 
+# sRGB bytes take only 256 values; tabulate byte -> linear once.
+_SRGB_LUT = _srgb_to_linear(np.arange(256).astype(np.float64)/255.0).astype(np.float32)
+
+# sRGB -> XYZ (D65) matrix, shared by the Lab converters below.
+# FP32 throughout: palette gaps dwarf FP32 rounding, and half-width floats
+# double SIMD lanes and halve memory traffic in the distance loops.
+_RGB2XYZ = np.array([[0.4124564, 0.3575761, 0.1804375],
+                     [0.2126729, 0.7151522, 0.0721750],
+                     [0.0193339, 0.1191920, 0.9503041]], dtype=np.float32)
+
 def _rgb_to_lab(rgb8):  # rgb8: (N,3) uint8 in [0,255]
     # sRGB -> XYZ (D65) -> Lab (D65)
-    rgb = rgb8.astype(np.float64) / 255.0
-    rgb = _srgb_to_linear(rgb)
-    M = np.array([[0.4124564, 0.3575761, 0.1804375],
-                  [0.2126729, 0.7151522, 0.0721750],
-                  [0.0193339, 0.1191920, 0.9503041]])
-    xyz = rgb @ M.T
+    rgb = _SRGB_LUT[rgb8]  # byte -> linear gather, no divide/where/pow
+    xyz = rgb @ _RGB2XYZ.T
     # Normalize by white point (D65)
-    Xn, Yn, Zn = 0.95047, 1.00000, 1.08883
+    Xn, Yn, Zn = np.float32(0.95047), np.float32(1.00000), np.float32(1.08883)
     x = xyz[:,0]/Xn; y = xyz[:,1]/Yn; z = xyz[:,2]/Zn
-    eps = 216/24389; kappa = 24389/27
+    eps = np.float32(216/24389); kappa = np.float32(24389/27)
     fx = np.where(x > eps, np.cbrt(x), (kappa*x + 16)/116)
     fy = np.where(y > eps, np.cbrt(y), (kappa*y + 16)/116)
     fz = np.where(z > eps, np.cbrt(z), (kappa*z + 16)/116)
@@ -87,60 +114,167 @@ def _rgb_to_lab(rgb8):  # rgb8: (N,3) uint8 in [0,255]
     b = 200*(fy - fz)
     return np.stack([L, a, b], axis=1)
 
+def _rgb_to_lab_bulk(rgb8):
+    """FP32 Lab for whole-image buffers, tuned for nearest-palette mapping.
+
+    Drops the linear dark segment and applies cbrt unconditionally: the
+    transform stays monotonic, and since image and palette go through the
+    same function the argmin over palette entries is unaffected while the
+    error stays below palette quantization noise.
+    """
+    rgb = _SRGB_LUT[rgb8]  # byte -> linear gather, no divide/where/pow
+    xyz = rgb @ _RGB2XYZ.T
+    Xn, Yn, Zn = np.float32(0.95047), np.float32(1.00000), np.float32(1.08883)
+    eps = np.float32(1e-8)
+    fx = np.cbrt(np.maximum(xyz[:,0]/Xn, eps))
+    fy = np.cbrt(np.maximum(xyz[:,1]/Yn, eps))
+    fz = np.cbrt(np.maximum(xyz[:,2]/Zn, eps))
+    L = 116*fy - 16
+    a = 500*(fx - fy)
+    b = 200*(fy - fz)
+    return np.stack([L, a, b], axis=1)
+
+def _lab_via_cms(img_rgb):
+    """Whole-image sRGB -> Lab through littlecms in one C pass.
+
+    Pillow's LAB mode stores L scaled to 0..255 and a/b as two's-complement
+    bytes; undo both so the result is deltaE-comparable float32 Lab.
+    """
+    lab8 = np.asarray(ImageCms.applyTransform(img_rgb, _CMS_RGB2LAB))
+    lab = np.empty(lab8.shape, dtype=np.float32)
+    lab[..., 0] = lab8[..., 0] * np.float32(100.0/255.0)
+    lab[..., 1:] = lab8[..., 1:].astype(np.int8)
+    return lab
+
 def _deltaE76(lab1, lab2):
     d = lab1 - lab2
     return np.sqrt(np.sum(d*d, axis=-1))
 
+if HAVE_NUMBA:
+    @njit(parallel=True, cache=True)
+    def _map_rgb_to_palette(rgb_u8, lab_pal, out_idx):
+        # Fused byte -> Lab -> argmin-deltaE: Lab lives in registers only,
+        # matching _rgb_to_lab_bulk (unconditional cbrt, clamped at 1e-8).
+        for i in prange(rgb_u8.shape[0]):
+            r = _SRGB_LUT[rgb_u8[i, 0]]
+            g = _SRGB_LUT[rgb_u8[i, 1]]
+            b = _SRGB_LUT[rgb_u8[i, 2]]
+            x = (0.4124564*r + 0.3575761*g + 0.1804375*b) / 0.95047
+            y = 0.2126729*r + 0.7151522*g + 0.0721750*b
+            z = (0.0193339*r + 0.1191920*g + 0.9503041*b) / 1.08883
+            fx = max(x, 1e-8) ** (1.0/3.0)
+            fy = max(y, 1e-8) ** (1.0/3.0)
+            fz = max(z, 1e-8) ** (1.0/3.0)
+            L = 116.0*fy - 16.0
+            A = 500.0*(fx - fy)
+            B = 200.0*(fy - fz)
+            best_k = 0
+            best_d2 = np.inf
+            for k in range(lab_pal.shape[0]):
+                dL = L - lab_pal[k, 0]
+                dA = A - lab_pal[k, 1]
+                dB = B - lab_pal[k, 2]
+                d2 = dL*dL + dA*dA + dB*dB
+                if d2 < best_d2:
+                    best_d2 = d2
+                    best_k = k
+            out_idx[i] = best_k
+
 
 # ----------------------------- Diversity-first posterize -----------------------------
 
 def _sample_uniform_grid(img_np, step=4):
     """Uniform spatial sampling to avoid large regions dominating."""
-    h, w, _ = img_np.shape
-    ys = np.arange(0, h, step)
-    xs = np.arange(0, w, step)
-    yy, xx = np.meshgrid(ys, xs, indexing="ij")
-    pts = img_np[yy, xx]  # (len(ys), len(xs), 3)
-    return pts.reshape(-1, 3)
+    # Strided slice is a zero-copy view; reshape compacts it in one pass
+    # (no meshgrid index tensor, no gather).
+    return img_np[::step, ::step].reshape(-1, 3)
 
 def _dedup_colors(rgb, round_to=16):
     """Bucket RGB to reduce near-duplicates (round_to ∈ {8,16,32})."""
     q = (rgb // round_to) * round_to + round_to//2
-    uq, idx = np.unique(q, axis=0, return_index=True)
-    return uq[idx.argsort()]
-
-def _farthest_point_palette(cand_lab, K, seed_idx=None, dist_fn=_deltaE76):
-    """Greedy k-center: pick farthest new color each step to maximize coverage."""
+    # Pack to one uint32 key per color: 1-D unique avoids the slow
+    # lex-sorting axis=0 path while keeping first-occurrence order.
+    key = ((q[:,0].astype(np.uint32) << 16) |
+           (q[:,1].astype(np.uint32) << 8) |
+           q[:,2].astype(np.uint32))
+    _, idx = np.unique(key, return_index=True)
+    return q[np.sort(idx)]
+
+def _farthest_point_palette(cand_lab, K, seed_idx=None):
+    """Greedy k-center: pick farthest new color each step to maximize coverage.
+
+    Works on squared distances throughout; argmax is sqrt-invariant.
+    For large candidate sets a k-d tree bounds each update: only points
+    within dmin.max() of the newly chosen center can have their nearest
+    center change, so the linear scan shrinks as the palette fills in.
+
+    Returns (chosen, assign, dmin): chosen palette indices, each point's
+    nearest chosen center (as a position in `chosen`), and its squared
+    distance to that center — both byproducts of the greedy loop, cached
+    so refinement doesn't recompute them.
+    """
     N = cand_lab.shape[0]
     if seed_idx is None:
-        chroma = np.sqrt(cand_lab[:,1]**2 + cand_lab[:,2]**2)
-        seed_idx = int(np.argmax(chroma))
+        chroma2 = cand_lab[:,1]**2 + cand_lab[:,2]**2
+        seed_idx = int(np.argmax(chroma2))
     chosen = [seed_idx]
-    dmin = dist_fn(cand_lab, cand_lab[seed_idx:seed_idx+1]).reshape(N)
+    diff = cand_lab - cand_lab[seed_idx]
+    dmin = np.einsum('ij,ij->i', diff, diff)
+    # Chosen points are pinned at -inf so argmax can never re-select one,
+    # even when another candidate ties the seed's chroma exactly.
+    dmin[seed_idx] = -np.inf
+    assign = np.zeros(N, dtype=np.intp)
+    tree = cKDTree(cand_lab) if (HAVE_SCIPY and N > 4096) else None
     for _ in range(1, K):
         idx = int(np.argmax(dmin))
         chosen.append(idx)
-        dmin = np.minimum(dmin, dist_fn(cand_lab, cand_lab[idx:idx+1]).reshape(N))
-    return np.array(chosen, dtype=int)
-
-def _kmedoids_one_iter(cand_lab, palette_idx, dist_fn=_deltaE76):
-    """One k-medoids update to reduce error without collapsing diversity."""
-    palette = cand_lab[palette_idx]
-    D = np.stack([dist_fn(cand_lab, p[None,:]) for p in palette], axis=1)  # (N,K)
-    assign = np.argmin(D, axis=1)
+        k = len(chosen) - 1
+        if tree is not None:
+            upd = np.asarray(tree.query_ball_point(cand_lab[idx],
+                                                   r=float(np.sqrt(max(dmin[idx], 0.0)))),
+                             dtype=np.intp)
+            diff = cand_lab[upd] - cand_lab[idx]
+            d2 = np.einsum('ij,ij->i', diff, diff)
+            closer = d2 < dmin[upd]
+            moved = upd[closer]
+            dmin[moved] = d2[closer]
+            assign[moved] = k
+        else:
+            diff = cand_lab - cand_lab[idx]
+            d2 = np.einsum('ij,ij->i', diff, diff)
+            closer = d2 < dmin
+            dmin = np.where(closer, d2, dmin)
+            assign[closer] = k
+        assign[idx] = k
+        dmin[idx] = -np.inf
+    return np.array(chosen, dtype=int), assign, dmin
+
+def _kmedoids_one_iter(cand_lab, palette_idx, assign):
+    """One medoid update to reduce error without collapsing diversity.
+
+    Reuses the assignment cached by farthest-point sampling and moves each
+    center to the member nearest its cluster's Lab mean: O(N) overall, versus
+    a fresh assignment plus quadratic pairwise sums per cluster.
+    """
     new_idx = []
-    for k in range(palette.shape[0]):
+    for k in range(len(palette_idx)):
         members = np.where(assign == k)[0]
         if len(members) == 0:
             new_idx.append(palette_idx[k]); continue
         sub = cand_lab[members]
-        SD = np.sum(np.sqrt(((sub[:,None,:]-sub[None,:,:])**2).sum(-1)), axis=1)
-        new_idx.append(members[int(np.argmin(SD))])
+        diff = sub - sub.mean(axis=0)
+        d2 = np.einsum('ij,ij->i', diff, diff)
+        new_idx.append(members[int(np.argmin(d2))])
     return np.array(new_idx, dtype=int)
 
-def posterize_diverse(img_rgb, colors=10, sample_step=4, bucket=16, refine=True, map_chunk=400_000):
+def posterize_diverse(img_rgb, colors=10, sample_step=4, bucket=16, refine=True,
+                      map_chunk=400_000, perceptual=False):
     """
     Quantize with a palette chosen for diversity (broad gamut). Returns a 'P' image.
+
+    Palette selection always happens in Lab. The per-pixel mapping defaults to
+    Pillow's C quantizer (RGB nearest); pass perceptual=True for deltaE76-Lab
+    matching at NumPy speed.
     """
     img_np = np.array(img_rgb, dtype=np.uint8)
 
@@ -149,23 +283,55 @@ def posterize_diverse(img_rgb, colors=10, sample_step=4, bucket=16, refine=True,
     cand_lab = _rgb_to_lab(cand_rgb)
 
     K = max(2, int(colors))
-    pal_idx = _farthest_point_palette(cand_lab, K)
+    pal_idx, assign, _ = _farthest_point_palette(cand_lab, K)
     if refine:
-        pal_idx = _kmedoids_one_iter(cand_lab, pal_idx)
+        pal_idx = _kmedoids_one_iter(cand_lab, pal_idx, assign)
     palette_rgb = cand_rgb[pal_idx]  # (K,3)
 
+    if not perceptual:
+        # Pillow's C quantizer handles the per-pixel nearest-palette match.
+        pal_img = Image.new("P", (1, 1))
+        pal_img.putpalette(palette_rgb.astype(np.uint8).reshape(-1).tolist())
+        return img_rgb.quantize(palette=pal_img, dither=DITHER_NONE)
+
     H, W, _ = img_np.shape
     flat_rgb = img_np.reshape(-1, 3)
-    lab_pal = _rgb_to_lab(palette_rgb)
-    out_idx = np.empty((flat_rgb.shape[0],), dtype=np.uint8)
 
-    start = 0
-    while start < flat_rgb.shape[0]:
-        end = min(start + map_chunk, flat_rgb.shape[0])
-        lab_chunk = _rgb_to_lab(flat_rgb[start:end])
-        D = np.stack([_deltaE76(lab_chunk, p[None,:]) for p in lab_pal], axis=1)
-        out_idx[start:end] = np.argmin(D, axis=1).astype(np.uint8)
-        start = end
+    # Upscaled pixel art repeats a handful of RGB values across huge runs:
+    # map each unique color once, then scatter through the inverse index.
+    key = ((flat_rgb[:,0].astype(np.uint32) << 16) |
+           (flat_rgb[:,1].astype(np.uint32) << 8) |
+           flat_rgb[:,2].astype(np.uint32))
+    u_keys, inverse = np.unique(key, return_inverse=True)
+    uniq_rgb = np.empty((u_keys.shape[0], 3), dtype=np.uint8)
+    uniq_rgb[:, 0] = (u_keys >> 16).astype(np.uint8)
+    uniq_rgb[:, 1] = (u_keys >> 8).astype(np.uint8)
+    uniq_rgb[:, 2] = u_keys.astype(np.uint8)
+
+    uniq_idx = np.empty(uniq_rgb.shape[0], dtype=np.uint8)
+    if HAVE_NUMBA:
+        _map_rgb_to_palette(uniq_rgb, _rgb_to_lab_bulk(palette_rgb), uniq_idx)
+    else:
+        if HAVE_CMS:
+            # Uniques and palette must go through the same converter.
+            uniq_row = Image.fromarray(uniq_rgb[None, :, :], "RGB")
+            lab_uniq = _lab_via_cms(uniq_row).reshape(-1, 3)
+            pal_row = Image.fromarray(palette_rgb[None, :, :], "RGB")
+            lab_pal = _lab_via_cms(pal_row).reshape(-1, 3)
+        else:
+            lab_uniq = _rgb_to_lab_bulk(uniq_rgb)
+            lab_pal = _rgb_to_lab_bulk(palette_rgb)
+        pal_sq = np.einsum('ij,ij->i', lab_pal, lab_pal)
+        start = 0
+        while start < lab_uniq.shape[0]:
+            end = min(start + map_chunk, lab_uniq.shape[0])
+            lab_chunk = lab_uniq[start:end]
+            # Squared deltaE76 via one GEMM; argmin is sqrt-invariant.
+            D2 = (np.einsum('ij,ij->i', lab_chunk, lab_chunk)[:,None] + pal_sq
+                  - 2.0 * lab_chunk @ lab_pal.T)
+            uniq_idx[start:end] = np.argmin(D2, axis=1).astype(np.uint8)
+            start = end
+    out_idx = uniq_idx[inverse]
 
     paletted = Image.fromarray(out_idx.reshape(H, W), mode="P")
     pal_list = palette_rgb.astype(np.uint8).reshape(-1).tolist()
@@ -176,48 +342,87 @@ def posterize_diverse(img_rgb, colors=10, sample_step=4, bucket=16, refine=True,
 # ----------------------------- Pixel-size estimation & downscale -----------------------------
 
 def _best_period(strength, lo, hi):
-    best_s, best_score = None, -1.0
+    """Pick the dominant period in [lo, hi] from the autocorrelation peak."""
     strength = strength.astype(np.float64)
-    strength = (strength - strength.mean()) / (strength.std() + 1e-6)
     n = len(strength)
-
-    for s in range(lo, min(hi, n) + 1):
-        best_for_s = -1.0
-        for o in range(s):
-            vals = strength[o::s]
-            if len(vals) <= 1:
-                continue
-            score = np.mean(np.abs(vals))
-            if score > best_for_s:
-                best_for_s = score
-        score = best_for_s / math.sqrt(s)
-        if score > best_score:
-            best_score, best_s = score, s
-    return best_s or 1
+    hi = min(hi, n - 1)
+    if n < 2 or hi < lo:
+        return 1
+    x = strength - strength.mean()
+    # Zero-padded FFT autocorrelation: O(n log n) for all lags at once.
+    f = np.fft.rfft(x, n=2*n)
+    ac = np.fft.irfft(f * np.conj(f))[:n]
+    if ac[0] <= 0:
+        return 1
+    ac /= ac[0]
+    return lo + int(np.argmax(ac[lo:hi+1]))
 
 def estimate_grid_step_from_edges(pal_img, smin=2, smax=64):
     arr = np.array(pal_img)  # palette indices
-    edges_x = (np.diff(arr, axis=1) != 0).astype(np.uint8)  # H x (W-1)
-    edges_y = (np.diff(arr, axis=0) != 0).astype(np.uint8)  # (H-1) x W
-    col_strength = edges_x.sum(axis=0)  # length W-1
-    row_strength = edges_y.sum(axis=1)  # length H-1
+    # XOR of neighbours is nonzero exactly at color changes; stays in uint8
+    # lanes with no comparison/cast intermediate, and count_nonzero is SIMD'd.
+    edges_x = arr[:, 1:] ^ arr[:, :-1]  # H x (W-1)
+    edges_y = arr[1:, :] ^ arr[:-1, :]  # (H-1) x W
+    col_strength = np.count_nonzero(edges_x, axis=0)  # length W-1
+    row_strength = np.count_nonzero(edges_y, axis=1)  # length H-1
     sx = _best_period(col_strength, smin, smax)
     sy = _best_period(row_strength, smin, smax)
     return sy, sx
 
+if HAVE_NUMBA:
+    @njit(parallel=True, cache=True)
+    def _mode_blocks_numba(blocks, out):
+        for i in prange(blocks.shape[0]):
+            cnt = np.zeros(256, np.uint16)
+            for j in range(blocks.shape[1]):
+                cnt[blocks[i, j]] += 1
+            out[i] = cnt.argmax()
+
+def _countless2x(arr):
+    """2x modal downsample via the 'countless' trick: the mode of four labels
+    falls out of pairwise equality masks, no histogram. Any label matching
+    another wins (ties break toward a, then c); all-distinct blocks yield b.
+    """
+    a = arr[0::2, 0::2]; b = arr[0::2, 1::2]
+    c = arr[1::2, 0::2]; d = arr[1::2, 1::2]
+    return np.where(a == b, a,
+           np.where(c == d, c,
+           np.where(a == c, a,
+           np.where(a == d, a,
+           np.where(b == c, b,
+           np.where(b == d, b, b))))))
+
 def downscale_by_mode(pal_img, sy, sx):
     arr = np.array(pal_img)
     H, W = arr.shape
     H2, W2 = (H // sy) * sy, (W // sx) * sx
     arr = arr[:H2, :W2]
 
+    if sy == sx in (2, 4):
+        out = _countless2x(arr)
+        if sy == 4:
+            out = _countless2x(out)
+        out_img = Image.fromarray(out, mode="P")
+        out_img.putpalette(pal_img.getpalette())
+        return out_img
+
     hb, wb = H2 // sy, W2 // sx
-    blocks = arr.reshape(hb, sy, wb, sx).swapaxes(1, 2).reshape(hb * wb, sy * sx)
+    B = hb * wb
 
-    out_flat = np.empty(hb * wb, dtype=np.uint8)
-    for i in range(blocks.shape[0]):
-        bc = np.bincount(blocks[i], minlength=256)
-        out_flat[i] = np.argmax(bc)
+    if HAVE_NUMBA and sy * sx <= 64:
+        # Small histograms fit in L1; one parallel pass over the blocks.
+        blocks = arr.reshape(hb, sy, wb, sx).swapaxes(1, 2).reshape(B, sy * sx)
+        out_flat = np.empty(B, dtype=np.uint8)
+        _mode_blocks_numba(blocks, out_flat)
+    else:
+        # One 2-D histogram over all blocks: derive each pixel's block id by
+        # broadcast and bincount block_id*256 + palette_value straight off the
+        # image layout, skipping the blocks-into-rows memory shuffle.
+        bid = ((np.arange(H2, dtype=np.int64) // sy)[:, None] * wb
+               + np.arange(W2, dtype=np.int64) // sx)
+        counts = np.bincount((bid * 256 + arr).ravel(),
+                             minlength=B * 256).reshape(B, 256)
+        out_flat = counts.argmax(axis=1).astype(np.uint8)
     out = out_flat.reshape(hb, wb)
 
     out_img = Image.fromarray(out, mode="P")
@@ -231,13 +436,13 @@ def fix_pixel_art(img,
                   colors=10,
                   smin=2, smax=64,
                   sample_step=4, bucket=16, refine=True,
-                  override=None):
+                  override=None, perceptual=False):
     """
     Full pipeline with transparency thresholding.
     """
     img_prep = flatten_transparency_threshold(img)
     pal = posterize_diverse(img_prep, colors=colors, sample_step=sample_step,
-                            bucket=bucket, refine=refine)
+                            bucket=bucket, refine=refine, perceptual=perceptual)
     if override is None:
         sy, sx = estimate_grid_step_from_edges(pal, smin=smin, smax=smax)
         if sx < sy:
@@ -268,6 +473,8 @@ def main():
     ap.add_argument("--bucket", type=int, default=16, choices=[8,16,32],
                     help="Pre-bucketing step (higher reduces near-duplicate candidates more).")
     ap.add_argument("--no-refine", action="store_true", help="Disable 1-iter k-medoids refinement.")
+    ap.add_argument("--perceptual", action="store_true",
+                    help="Match pixels to the palette by deltaE76 in Lab instead of Pillow's RGB quantizer.")
     ap.add_argument("--preview", type=int, default=0, help="If >0, also save an Nx preview (nearest).")
     args = ap.parse_args()
 
@@ -278,7 +485,8 @@ def main():
         colors=args.colors,
         smin=args.range[0], smax=args.range[1],
         sample_step=args.sample_step, bucket=args.bucket, refine=not args.no_refine,
-        override=tuple(args.override) if args.override else None
+        override=tuple(args.override) if args.override else None,
+        perceptual=args.perceptual
     )
 
     out = args.output or (args.input.rsplit(".",1)[0] + f".pixel_{sy}x{sx}.png")